@@ -1,5 +1,7 @@
 import pygame
-import copy
+import array
+import functools
+import random
 import sys
 from enum import Enum, auto
 
@@ -20,17 +22,201 @@ LIGHT_SQUARE = (238, 238, 210)
 HIGHLIGHT = (186, 202, 68)
 MOVE_HIGHLIGHT = (119, 149, 86, 150)  # Green with transparency
 
-class PieceType(Enum):
-    KING = auto()
-    QUEEN = auto()
-    ROOK = auto()
-    BISHOP = auto()
-    KNIGHT = auto()
-    PAWN = auto()
+# Piece types and colors are plain ints so hot comparisons stay cheap
+KING, QUEEN, ROOK, BISHOP, KNIGHT, PAWN = range(6)
+WHITE_C, BLACK_C = 0, 1
+PIECE_LETTERS = "kqrbnp"
 
-class PieceColor(Enum):
-    WHITE = auto()
-    BLACK = auto()
+# Bitboard slots, indexed as color * 6 + piece type
+WK, WQ, WR, WB, WN, WP, BK, BQ, BR, BB, BN, BP = range(12)
+
+# Castling rights bits
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+ALL_CASTLING = CASTLE_WK | CASTLE_WQ | CASTLE_BK | CASTLE_BQ
+
+# Rights that survive a move touching each square (king and rook home squares)
+CASTLING_MASK = [ALL_CASTLING] * (BOARD_SIZE * BOARD_SIZE)
+CASTLING_MASK[0] &= ~CASTLE_BQ
+CASTLING_MASK[4] &= ~(CASTLE_BK | CASTLE_BQ)
+CASTLING_MASK[7] &= ~CASTLE_BK
+CASTLING_MASK[56] &= ~CASTLE_WQ
+CASTLING_MASK[60] &= ~(CASTLE_WK | CASTLE_WQ)
+CASTLING_MASK[63] &= ~CASTLE_WK
+
+# Squares between king and rook that must be empty, per color as (kingside, queenside)
+CASTLE_EMPTY_MASK = [
+    (0x6000000000000000, 0x0E00000000000000),
+    (0x0000000000000060, 0x000000000000000E),
+]
+
+# Squares the king crosses and lands on, per color as (kingside, queenside)
+CASTLE_PATH = [
+    (0x6000000000000000, 0x0C00000000000000),
+    (0x0000000000000060, 0x000000000000000C),
+]
+
+KNIGHT_OFFSETS = [
+    (-2, -1), (-2, 1),
+    (-1, -2), (-1, 2),
+    (1, -2),  (1, 2),
+    (2, -1),  (2, 1)
+]
+KING_OFFSETS = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),           (0, 1),
+    (1, -1),  (1, 0),  (1, 1)
+]
+
+def build_jump_table(offsets):
+    # Bitboard of every on-board destination from each square
+    table = []
+    for sq in range(BOARD_SIZE * BOARD_SIZE):
+        row, col = divmod(sq, BOARD_SIZE)
+        attacks = 0
+        for dr, dc in offsets:
+            end_row, end_col = row + dr, col + dc
+            if 0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE:
+                attacks |= 1 << (end_row * BOARD_SIZE + end_col)
+        table.append(attacks)
+    return table
+
+KNIGHT_ATTACKS = build_jump_table(KNIGHT_OFFSETS)
+KING_ATTACKS = build_jump_table(KING_OFFSETS)
+
+# Pawn tables per color (white moves up the board): diagonal captures,
+# single pushes, and double pushes from the starting row
+PAWN_ATTACKS = [
+    build_jump_table([(-1, -1), (-1, 1)]),
+    build_jump_table([(1, -1), (1, 1)]),
+]
+PAWN_PUSHES = [
+    build_jump_table([(-1, 0)]),
+    build_jump_table([(1, 0)]),
+]
+PAWN_DOUBLE_PUSHES = [
+    [1 << (sq - 2 * BOARD_SIZE) if sq // BOARD_SIZE == 6 else 0
+     for sq in range(BOARD_SIZE * BOARD_SIZE)],
+    [1 << (sq + 2 * BOARD_SIZE) if sq // BOARD_SIZE == 1 else 0
+     for sq in range(BOARD_SIZE * BOARD_SIZE)],
+]
+PROMOTION_RANKS = 0xFF000000000000FF
+
+FULL_BOARD = (1 << (BOARD_SIZE * BOARD_SIZE)) - 1
+FILE_MASK = [0x0101010101010101 << col for col in range(BOARD_SIZE)]
+
+def build_line_masks(line_key):
+    # For each square, the bitboard of all squares sharing its line_key
+    squares = [divmod(sq, BOARD_SIZE) for sq in range(BOARD_SIZE * BOARD_SIZE)]
+    return [sum(1 << (r * BOARD_SIZE + c) for r, c in squares if line_key(r, c) == line_key(row, col))
+            for row, col in squares]
+
+DIAG_MASK = build_line_masks(lambda row, col: row - col)
+ANTIDIAG_MASK = build_line_masks(lambda row, col: row + col)
+
+def build_rank_table():
+    # Sliding attacks along a single rank for every slider column and rank occupancy
+    table = []
+    for col in range(BOARD_SIZE):
+        col_table = []
+        for occ in range(1 << BOARD_SIZE):
+            attacks = 0
+            for step in (-1, 1):
+                c = col + step
+                while 0 <= c < BOARD_SIZE:
+                    attacks |= 1 << c
+                    if occ & (1 << c):
+                        break
+                    c += step
+            col_table.append(attacks)
+        table.append(col_table)
+    return table
+
+RANK_ATTACKS = build_rank_table()
+
+def byteswap(bb):
+    return int.from_bytes(bb.to_bytes(8, 'little'), 'big')
+
+def line_attacks(occ, sq_bb, mask):
+    # Hyperbola Quintessence, valid for lines with one square per rank (files and diagonals)
+    forward = occ & mask
+    reverse = byteswap(forward)
+    forward -= 2 * sq_bb
+    reverse -= 2 * byteswap(sq_bb)
+    return (forward ^ byteswap(reverse & FULL_BOARD)) & mask
+
+def rook_attacks(occ, sq):
+    row_shift = sq & ~7
+    col = sq & 7
+    return (line_attacks(occ, 1 << sq, FILE_MASK[col]) |
+            RANK_ATTACKS[col][(occ >> row_shift) & 0xFF] << row_shift)
+
+def bishop_attacks(occ, sq):
+    sq_bb = 1 << sq
+    return line_attacks(occ, sq_bb, DIAG_MASK[sq]) | line_attacks(occ, sq_bb, ANTIDIAG_MASK[sq])
+
+def build_between_table():
+    # Squares strictly between two squares that share a rank, file or diagonal
+    table = [[0] * (BOARD_SIZE * BOARD_SIZE) for _ in range(BOARD_SIZE * BOARD_SIZE)]
+    for sq in range(BOARD_SIZE * BOARD_SIZE):
+        row, col = divmod(sq, BOARD_SIZE)
+        for dr, dc in KING_OFFSETS:
+            between = 0
+            end_row, end_col = row + dr, col + dc
+            while 0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE:
+                end_sq = end_row * BOARD_SIZE + end_col
+                table[sq][end_sq] = between
+                between |= 1 << end_sq
+                end_row, end_col = end_row + dr, end_col + dc
+    return table
+
+BETWEEN = build_between_table()
+
+def iter_bits(bb):
+    # Yield the square of each set bit, lowest first
+    while bb:
+        lsb = bb & -bb
+        yield lsb.bit_length() - 1
+        bb ^= lsb
+
+def piece_index(color, piece_type):
+    return color * 6 + piece_type
+
+# Random keys for Zobrist hashing of positions
+ZOBRIST_PIECES = [[random.getrandbits(64) for _ in range(BOARD_SIZE * BOARD_SIZE)] for _ in range(12)]
+ZOBRIST_SIDE = random.getrandbits(64)
+ZOBRIST_EP = [random.getrandbits(64) for _ in range(BOARD_SIZE)]
+ZOBRIST_CASTLE = [random.getrandbits(64) for _ in range(ALL_CASTLING + 1)]
+
+# Moves are packed into 16-bit ints: from (6 bits) | to (6) | promotion piece (2) | flag (2)
+MOVE_NORMAL, MOVE_PROMOTION, MOVE_EN_PASSANT, MOVE_CASTLE = range(4)
+PROMOTION_PIECES = [QUEEN, ROOK, BISHOP, KNIGHT]
+
+def encode(from_sq, to_sq, flags=MOVE_NORMAL, promo=0):
+    return from_sq | to_sq << 6 | promo << 12 | flags << 14
+
+def decode(move):
+    return move & 63, (move >> 6) & 63, move >> 14, (move >> 12) & 3
+
+def decode_history_entry(entry):
+    # Render a move_history tuple in UCI notation, e.g. "e2e4" or "e7e8q"
+    from_sq, to_sq, flags, promotion_piece = entry
+    uci = ""
+    for sq in (from_sq, to_sq):
+        row, col = divmod(sq, BOARD_SIZE)
+        uci += "abcdefgh"[col] + str(BOARD_SIZE - row)
+    if promotion_piece is not None:
+        uci += PIECE_LETTERS[promotion_piece]
+    return uci
+
+# Room for every pseudo-legal move of a single position
+MAX_MOVES = 256
+
+def add_moves(buf, idx, from_sq, targets):
+    # Write one plain move per set bit in the targets bitboard, returning the next free slot
+    for to_sq in iter_bits(targets):
+        buf[idx] = encode(from_sq, to_sq)
+        idx += 1
+    return idx
 
 class GameState(Enum):
     ACTIVE = auto()
@@ -39,6 +225,9 @@ class GameState(Enum):
     STALEMATE = auto()
 
 class Move:
+    __slots__ = ('start_row', 'start_col', 'end_row', 'end_col', 'piece_moved', 'piece_captured',
+                 'is_castle', 'is_promotion', 'is_en_passant', 'promotion_piece')
+    
     def __init__(self, start_pos, end_pos, piece_moved, piece_captured=None, is_castle=False, 
                 is_promotion=False, is_en_passant=False, promotion_piece=None):
         self.start_row, self.start_col = start_pos
@@ -50,42 +239,36 @@ class Move:
         self.is_en_passant = is_en_passant
         self.promotion_piece = promotion_piece
 
-    def __deepcopy__(self, memo):
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        for k, v in self.__dict__.items():
-            # piece_moved and piece_captured are Piece objects, which already have custom __deepcopy__
-            setattr(result, k, copy.deepcopy(v, memo))
-        return result
+    @classmethod
+    def from_int(cls, board, move):
+        from_sq, to_sq, flags, promo = decode(move)
+        start_pos = divmod(from_sq, BOARD_SIZE)
+        end_pos = divmod(to_sq, BOARD_SIZE)
+        is_en_passant = flags == MOVE_EN_PASSANT
+        captured_pos = (start_pos[0], end_pos[1]) if is_en_passant else end_pos
+        is_promotion = flags == MOVE_PROMOTION
+        return cls(start_pos, end_pos, board.get_piece(start_pos), board.get_piece(captured_pos),
+                   is_castle=flags == MOVE_CASTLE, is_promotion=is_promotion, is_en_passant=is_en_passant,
+                   promotion_piece=PROMOTION_PIECES[promo] if is_promotion else None)
 
-class Piece:
-    def __init__(self, color, piece_type):
-        self.color = color
-        self.piece_type = piece_type
-        self.has_moved = False
-        self.image = None
-        self.load_image()
-        
-    def load_image(self):
-        color_str = "w" if self.color == PieceColor.WHITE else "b"
-        piece_str = ""
-        
-        if self.piece_type == PieceType.KING:
-            piece_str = "k"
-        elif self.piece_type == PieceType.QUEEN:
-            piece_str = "q"
-        elif self.piece_type == PieceType.ROOK:
-            piece_str = "r"
-        elif self.piece_type == PieceType.BISHOP:
-            piece_str = "b"
-        elif self.piece_type == PieceType.KNIGHT:
-            piece_str = "n"
-        elif self.piece_type == PieceType.PAWN:
-            piece_str = "p"
-            
-        piece_key = color_str + piece_str
-        if piece_key not in IMAGES:
+    def to_int(self):
+        if self.is_castle:
+            flags = MOVE_CASTLE
+        elif self.is_en_passant:
+            flags = MOVE_EN_PASSANT
+        elif self.is_promotion:
+            flags = MOVE_PROMOTION
+        else:
+            flags = MOVE_NORMAL
+        promo = PROMOTION_PIECES.index(self.promotion_piece) if self.is_promotion else 0
+        return encode(self.start_row * BOARD_SIZE + self.start_col,
+                      self.end_row * BOARD_SIZE + self.end_col, flags, promo)
+
+def load_images():
+    # Load every piece image once, keyed like Piece.image_key
+    for color_str, fallback_color in (("w", WHITE), ("b", BLACK)):
+        for piece_str in PIECE_LETTERS:
+            piece_key = color_str + piece_str
             try:
                 IMAGES[piece_key] = pygame.transform.scale(
                     pygame.image.load(f"resources/{piece_key}.png"), 
@@ -94,323 +277,327 @@ class Piece:
             except:
                 # Create a basic shape if image not found
                 surf = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-                color = WHITE if self.color == PieceColor.WHITE else BLACK
-                pygame.draw.circle(surf, color, (SQUARE_SIZE//2, SQUARE_SIZE//2), SQUARE_SIZE//3)
+                pygame.draw.circle(surf, fallback_color, (SQUARE_SIZE//2, SQUARE_SIZE//2), SQUARE_SIZE//3)
                 IMAGES[piece_key] = surf
-                
-        self.image = IMAGES[piece_key]
+
+class Piece:
+    __slots__ = ('color', 'piece_type', 'index', 'image_key')
+    
+    def __init__(self, color, piece_type):
+        self.color = color
+        self.piece_type = piece_type
+        self.index = piece_index(color, piece_type)
+        self.image_key = "wb"[color] + PIECE_LETTERS[piece_type]
     
-    def get_possible_moves(self, board, position, for_attack=False):
-        # This method should be overridden by specific piece classes
-        return []
+    @property
+    def image(self):
+        return IMAGES[self.image_key]
+    
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
+        # This method should be overridden by specific piece classes.
+        # Moves are written into buf from slot idx on; the next free slot is returned.
+        return idx
     
     def is_valid_move(self, board, start_pos, end_pos):
         # Check if the move is in the list of possible moves
-        possible_moves = self.get_possible_moves(board, start_pos)
-        return end_pos in [(move.end_row, move.end_col) for move in possible_moves]
-
-    def __deepcopy__(self, memo):
-        # Create a new instance without calling __init__
-        cls = self.__class__
-        result = cls.__new__(cls)
-        memo[id(self)] = result
-        
-        # Only copy essential attributes
-        result.color = self.color
-        result.piece_type = self.piece_type
-        result.has_moved = self.has_moved
-        result.image = self.image  # Shallow copy for image
-        
-        return result
+        buf = board.move_buf
+        count = self.get_possible_moves(board, start_pos, buf, 0)
+        end_sq = end_pos[0] * BOARD_SIZE + end_pos[1]
+        return end_sq in [decode(move)[1] for move in buf[:count]]
 
 class King(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.KING)
+        super().__init__(color, KING)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        
-        for dr, dc in directions:
-            end_row, end_col = row + dr, col + dc
-            if 0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE:
-                end_piece = board.get_piece((end_row, end_col))
-                if end_piece is None or end_piece.color != self.color:
-                    moves.append(Move((row, col), (end_row, end_col), self, end_piece))
+        sq = row * BOARD_SIZE + col
+        attacks = KING_ATTACKS[sq] & ~board.color_occupancy(self.color)
+        idx = add_moves(buf, idx, sq, attacks)
+        
+        kingside, queenside = (CASTLE_WK, CASTLE_WQ) if self.color == WHITE_C else (CASTLE_BK, CASTLE_BQ)
         
         # Only add castling moves if not for attack
-        if not for_attack and not self.has_moved and not board.is_in_check(self.color):
+        if not for_attack and board.castling & (kingside | queenside) and not board.is_in_check(self.color):
+            rooks = board.bb[piece_index(self.color, ROOK)]
+            kingside_empty, queenside_empty = CASTLE_EMPTY_MASK[self.color]
+            kingside_path, queenside_path = CASTLE_PATH[self.color]
+            
             # Kingside castle
-            if (board.get_piece((row, col+1)) is None and 
-                board.get_piece((row, col+2)) is None and 
-                isinstance(board.get_piece((row, col+3)), Rook) and 
-                not board.get_piece((row, col+3)).has_moved):
+            if (board.castling & kingside and 
+                not board.occ_all & kingside_empty and 
+                rooks & (1 << (sq + 3))):
                 # Check if king passes through check
-                if not board.is_position_under_attack((row, col+1), self.color) and not board.is_position_under_attack((row, col+2), self.color):
-                    moves.append(Move((row, col), (row, col+2), self, is_castle=True))
+                if not board.attack_map(self.color ^ 1) & kingside_path:
+                    buf[idx] = encode(sq, sq + 2, MOVE_CASTLE)
+                    idx += 1
             
             # Queenside castle
-            if (board.get_piece((row, col-1)) is None and 
-                board.get_piece((row, col-2)) is None and 
-                board.get_piece((row, col-3)) is None and 
-                isinstance(board.get_piece((row, col-4)), Rook) and 
-                not board.get_piece((row, col-4)).has_moved):
+            if (board.castling & queenside and 
+                not board.occ_all & queenside_empty and 
+                rooks & (1 << (sq - 4))):
                 # Check if king passes through check
-                if not board.is_position_under_attack((row, col-1), self.color) and not board.is_position_under_attack((row, col-2), self.color):
-                    moves.append(Move((row, col), (row, col-2), self, is_castle=True))
+                if not board.attack_map(self.color ^ 1) & queenside_path:
+                    buf[idx] = encode(sq, sq - 2, MOVE_CASTLE)
+                    idx += 1
         
-        return moves
+        return idx
 
 class Queen(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.QUEEN)
+        super().__init__(color, QUEEN)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
+        sq = row * BOARD_SIZE + col
         
         # Queen moves like a rook and bishop combined
-        directions = [
-            (-1, -1), (-1, 0), (-1, 1),
-            (0, -1),           (0, 1),
-            (1, -1),  (1, 0),  (1, 1)
-        ]
-        
-        for dr, dc in directions:
-            for i in range(1, BOARD_SIZE):
-                end_row, end_col = row + dr * i, col + dc * i
-                if not (0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE):
-                    break
-                
-                end_piece = board.get_piece((end_row, end_col))
-                if end_piece is None:
-                    moves.append(Move((row, col), (end_row, end_col), self))
-                elif end_piece.color != self.color:
-                    moves.append(Move((row, col), (end_row, end_col), self, end_piece))
-                    break
-                else:
-                    break
-                    
-        return moves
+        attacks = (rook_attacks(board.occ_all, sq) | bishop_attacks(board.occ_all, sq)) & ~board.color_occupancy(self.color)
+        return add_moves(buf, idx, sq, attacks)
 
 class Rook(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.ROOK)
+        super().__init__(color, ROOK)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
+        sq = row * BOARD_SIZE + col
         
         # Rook moves horizontally and vertically
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in directions:
-            for i in range(1, BOARD_SIZE):
-                end_row, end_col = row + dr * i, col + dc * i
-                if not (0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE):
-                    break
-                
-                end_piece = board.get_piece((end_row, end_col))
-                if end_piece is None:
-                    moves.append(Move((row, col), (end_row, end_col), self))
-                elif end_piece.color != self.color:
-                    moves.append(Move((row, col), (end_row, end_col), self, end_piece))
-                    break
-                else:
-                    break
-                    
-        return moves
+        attacks = rook_attacks(board.occ_all, sq) & ~board.color_occupancy(self.color)
+        return add_moves(buf, idx, sq, attacks)
 
 class Bishop(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.BISHOP)
+        super().__init__(color, BISHOP)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
+        sq = row * BOARD_SIZE + col
         
         # Bishop moves diagonally
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        
-        for dr, dc in directions:
-            for i in range(1, BOARD_SIZE):
-                end_row, end_col = row + dr * i, col + dc * i
-                if not (0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE):
-                    break
-                
-                end_piece = board.get_piece((end_row, end_col))
-                if end_piece is None:
-                    moves.append(Move((row, col), (end_row, end_col), self))
-                elif end_piece.color != self.color:
-                    moves.append(Move((row, col), (end_row, end_col), self, end_piece))
-                    break
-                else:
-                    break
-                    
-        return moves
+        attacks = bishop_attacks(board.occ_all, sq) & ~board.color_occupancy(self.color)
+        return add_moves(buf, idx, sq, attacks)
 
 class Knight(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.KNIGHT)
+        super().__init__(color, KNIGHT)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
+        sq = row * BOARD_SIZE + col
         
         # Knight L-shaped moves
-        knight_moves = [
-            (-2, -1), (-2, 1),
-            (-1, -2), (-1, 2),
-            (1, -2),  (1, 2),
-            (2, -1),  (2, 1)
-        ]
-        
-        for dr, dc in knight_moves:
-            end_row, end_col = row + dr, col + dc
-            if 0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE:
-                end_piece = board.get_piece((end_row, end_col))
-                if end_piece is None:
-                    moves.append(Move((row, col), (end_row, end_col), self))
-                elif end_piece.color != self.color:
-                    moves.append(Move((row, col), (end_row, end_col), self, end_piece))
-                    
-        return moves
+        attacks = KNIGHT_ATTACKS[sq] & ~board.color_occupancy(self.color)
+        return add_moves(buf, idx, sq, attacks)
 
 class Pawn(Piece):
+    __slots__ = ()
+    
     def __init__(self, color):
-        super().__init__(color, PieceType.PAWN)
+        super().__init__(color, PAWN)
         
-    def get_possible_moves(self, board, position, for_attack=False):
+    def get_possible_moves(self, board, position, buf, idx, for_attack=False):
         row, col = position
-        moves = []
-        
-        # Direction based on pawn color
-        direction = -1 if self.color == PieceColor.WHITE else 1
-        
-        # Forward one square
-        if 0 <= row + direction < BOARD_SIZE:
-            if board.get_piece((row + direction, col)) is None:
-                # Check for promotion
-                if (row + direction == 0 and self.color == PieceColor.WHITE) or (row + direction == 7 and self.color == PieceColor.BLACK):
-                    # Add promotion moves for all possible pieces
-                    for piece_type in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]:
-                        moves.append(Move((row, col), (row + direction, col), self, is_promotion=True, promotion_piece=piece_type))
-                else:
-                    moves.append(Move((row, col), (row + direction, col), self))
-                
-                # Forward two squares from starting position
-                start_row = 6 if self.color == PieceColor.WHITE else 1
-                if row == start_row and board.get_piece((row + 2*direction, col)) is None:
-                    moves.append(Move((row, col), (row + 2*direction, col), self))
+        sq = row * BOARD_SIZE + col
+        own = board.color_occupancy(self.color)
+        empty = ~board.occ_all
+        
+        # Forward one square, and two from the starting row if both are empty
+        pushes = PAWN_PUSHES[self.color][sq] & empty
+        if pushes:
+            pushes |= PAWN_DOUBLE_PUSHES[self.color][sq] & empty
         
         # Diagonal captures
-        for dc in [-1, 1]:
-            if 0 <= row + direction < BOARD_SIZE and 0 <= col + dc < BOARD_SIZE:
-                end_piece = board.get_piece((row + direction, col + dc))
-                if end_piece is not None and end_piece.color != self.color:
-                    # Check for promotion
-                    if (row + direction == 0 and self.color == PieceColor.WHITE) or (row + direction == 7 and self.color == PieceColor.BLACK):
-                        for piece_type in [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]:
-                            moves.append(Move((row, col), (row + direction, col + dc), self, end_piece, is_promotion=True, promotion_piece=piece_type))
-                    else:
-                        moves.append(Move((row, col), (row + direction, col + dc), self, end_piece))
-                
-                # En passant
-                if board.en_passant_target == (row, col + dc):
-                    captured_pawn = board.get_piece((row, col + dc))
-                    moves.append(Move((row, col), (row + direction, col + dc), self, captured_pawn, is_en_passant=True))
-                    
-        return moves
+        captures = PAWN_ATTACKS[self.color][sq] & board.occ_all & ~own
+        
+        targets = pushes | captures
+        if targets & PROMOTION_RANKS:
+            # Add promotion moves for all possible pieces
+            for to_sq in iter_bits(targets):
+                for promo in range(len(PROMOTION_PIECES)):
+                    buf[idx] = encode(sq, to_sq, MOVE_PROMOTION, promo)
+                    idx += 1
+        else:
+            idx = add_moves(buf, idx, sq, targets)
+        
+        # En passant onto the square the enemy pawn skipped
+        if board.en_passant_target:
+            ep_row, ep_col = board.en_passant_target
+            ep_bb = PAWN_ATTACKS[self.color][sq] & (1 << (ep_row * BOARD_SIZE + ep_col))
+            if ep_bb:
+                buf[idx] = encode(sq, ep_bb.bit_length() - 1, MOVE_EN_PASSANT)
+                idx += 1
+        
+        return idx
+
+# Shared, stateless piece instances indexed like Board.bb
+PIECE_TABLE = [piece_class(color) for color in (WHITE_C, BLACK_C)
+               for piece_class in (King, Queen, Rook, Bishop, Knight, Pawn)]
 
 class Board:
     def __init__(self, setup=True):
-        self.board = [[None for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
-        self.current_player = PieceColor.WHITE
+        # One bitboard per piece type and color, bit (row * 8 + col) set when occupied
+        self.bb = [0] * 12
+        self.occ_white = 0
+        self.occ_black = 0
+        self.occ_all = 0
+        self.castling = 0
+        self.zobrist = 0
+        self.king_sq = [None, None]
+        self.current_player = WHITE_C
         self.game_state = GameState.ACTIVE
         self.move_history = []
+        self.undo_stack = []
+        # Squares attacked by each color, computed on demand for the current position
+        self.attack_maps = [None, None]
+        # Scratch space shared by every move generation on this board
+        self.move_buf = array.array('H', [0] * MAX_MOVES)
         self.en_passant_target = None
         if setup:
             self.setup_board()
         
     def setup_board(self):
-        # Setup pawns
-        for col in range(BOARD_SIZE):
-            self.board[1][col] = Pawn(PieceColor.BLACK)
-            self.board[6][col] = Pawn(PieceColor.WHITE)
-        
-        # Setup other pieces
-        back_row_order = [Rook, Knight, Bishop, Queen, King, Bishop, Knight, Rook]
-        for col, piece_class in enumerate(back_row_order):
-            self.board[0][col] = piece_class(PieceColor.BLACK)
-            self.board[7][col] = piece_class(PieceColor.WHITE)
+        self.bb[WK] = 0x1000000000000000
+        self.bb[WQ] = 0x0800000000000000
+        self.bb[WR] = 0x8100000000000000
+        self.bb[WB] = 0x2400000000000000
+        self.bb[WN] = 0x4200000000000000
+        self.bb[WP] = 0x00FF000000000000
+        self.bb[BK] = 0x0000000000000010
+        self.bb[BQ] = 0x0000000000000008
+        self.bb[BR] = 0x0000000000000081
+        self.bb[BB] = 0x0000000000000024
+        self.bb[BN] = 0x0000000000000042
+        self.bb[BP] = 0x000000000000FF00
+        self.castling = ALL_CASTLING
+        self.king_sq = [(7, 4), (0, 4)]
+        self.update_occupancy()
+        self.zobrist = self.compute_zobrist()
+    
+    def update_occupancy(self):
+        bb = self.bb
+        self.occ_white = bb[WK] | bb[WQ] | bb[WR] | bb[WB] | bb[WN] | bb[WP]
+        self.occ_black = bb[BK] | bb[BQ] | bb[BR] | bb[BB] | bb[BN] | bb[BP]
+        self.occ_all = self.occ_white | self.occ_black
+    
+    def compute_zobrist(self):
+        key = 0
+        for idx, bb in enumerate(self.bb):
+            for sq in iter_bits(bb):
+                key ^= ZOBRIST_PIECES[idx][sq]
+        key ^= ZOBRIST_CASTLE[self.castling]
+        if self.en_passant_target:
+            key ^= ZOBRIST_EP[self.en_passant_target[1]]
+        if self.current_player == BLACK_C:
+            key ^= ZOBRIST_SIDE
+        return key
+    
+    def color_occupancy(self, color):
+        return self.occ_white if color == WHITE_C else self.occ_black
     
     def get_piece(self, position):
         row, col = position
         if 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
-            return self.board[row][col]
+            sq_bb = 1 << (row * BOARD_SIZE + col)
+            if not self.occ_all & sq_bb:
+                return None
+            for idx, bb in enumerate(self.bb):
+                if bb & sq_bb:
+                    return PIECE_TABLE[idx]
         return None
     
     def make_move(self, move, update_state=True):
+        from_sq, to_sq, flags, promo = decode(move)
+        start_row, start_col = divmod(from_sq, BOARD_SIZE)
+        
         # Get the pieces
-        piece = self.get_piece((move.start_row, move.start_col))
+        piece = self.get_piece((start_row, start_col))
         
         # Check if it's a valid piece and player's turn
         if piece is None or piece.color != self.current_player:
             return False
         
-        # For now, we'll implement a simplified version for testing
-        if move.is_castle:
+        bb = self.bb
+        from_bb = 1 << from_sq
+        to_bb = 1 << to_sq
+        
+        # Collect (bitboard index, mask) toggles; XOR-ing them again undoes the move
+        toggles = []
+        
+        # Remove the captured piece, which sits beside us for en passant
+        if flags == MOVE_EN_PASSANT:
+            captured_bb = 1 << ((from_sq & ~7) | (to_sq & 7))
+        else:
+            captured_bb = to_bb
+        enemy_start = 6 if piece.color == WHITE_C else 0
+        for idx in range(enemy_start, enemy_start + 6):
+            if bb[idx] & captured_bb:
+                toggles.append((idx, captured_bb))
+                break
+        
+        if flags == MOVE_CASTLE:
+            rook_idx = piece_index(piece.color, ROOK)
+            row_start = start_row * BOARD_SIZE
             # Kingside castle
-            if move.end_col - move.start_col == 2:
-                rook = self.get_piece((move.start_row, 7))
-                self.board[move.start_row][5] = rook
-                self.board[move.start_row][7] = None
-                rook.has_moved = True
+            if to_sq - from_sq == 2:
+                toggles.append((rook_idx, (1 << (row_start + 7)) | (1 << (row_start + 5))))
             # Queenside castle
-            elif move.end_col - move.start_col == -2:
-                rook = self.get_piece((move.start_row, 0))
-                self.board[move.start_row][3] = rook
-                self.board[move.start_row][0] = None
-                rook.has_moved = True
-        
-        # Handle en passant capture
-        if move.is_en_passant:
-            self.board[move.start_row][move.end_col] = None
-        
-        # Move the piece
-        self.board[move.start_row][move.start_col] = None
-        
-        # Handle promotion
-        if move.is_promotion and move.promotion_piece:
-            if move.promotion_piece == PieceType.QUEEN:
-                self.board[move.end_row][move.end_col] = Queen(piece.color)
-            elif move.promotion_piece == PieceType.ROOK:
-                self.board[move.end_row][move.end_col] = Rook(piece.color)
-            elif move.promotion_piece == PieceType.BISHOP:
-                self.board[move.end_row][move.end_col] = Bishop(piece.color)
-            elif move.promotion_piece == PieceType.KNIGHT:
-                self.board[move.end_row][move.end_col] = Knight(piece.color)
+            elif to_sq - from_sq == -2:
+                toggles.append((rook_idx, (1 << row_start) | (1 << (row_start + 3))))
+        
+        # Move the piece, handling promotion
+        if flags == MOVE_PROMOTION:
+            toggles.append((piece.index, from_bb))
+            toggles.append((piece_index(piece.color, PROMOTION_PIECES[promo]), to_bb))
         else:
-            self.board[move.end_row][move.end_col] = piece
+            toggles.append((piece.index, from_bb | to_bb))
+        
+        zobrist = self.zobrist
+        for idx, mask in toggles:
+            bb[idx] ^= mask
+            for toggled_sq in iter_bits(mask):
+                zobrist ^= ZOBRIST_PIECES[idx][toggled_sq]
+        self.update_occupancy()
         
-        # Update piece's move status
-        piece.has_moved = True
+        self.undo_stack.append((move, toggles, self.castling, self.en_passant_target,
+                                self.king_sq[piece.color], self.game_state, self.zobrist))
+        # Hash out the old castling rights and en passant file, and flip the side to move
+        zobrist ^= ZOBRIST_CASTLE[self.castling] ^ ZOBRIST_SIDE
+        if self.en_passant_target:
+            zobrist ^= ZOBRIST_EP[self.en_passant_target[1]]
+        
+        if piece.piece_type == KING:
+            self.king_sq[piece.color] = divmod(to_sq, BOARD_SIZE)
+        
+        # Moving the king or a rook, or capturing a rook at home, loses castling rights
+        self.castling &= CASTLING_MASK[from_sq] & CASTLING_MASK[to_sq]
         
         # Set en passant target if pawn moved two squares
         self.en_passant_target = None
-        if isinstance(piece, Pawn) and abs(move.start_row - move.end_row) == 2:
-            self.en_passant_target = (move.start_row + (1 if piece.color == PieceColor.BLACK else -1), move.start_col)
+        if piece.piece_type == PAWN and abs(to_sq - from_sq) == 2 * BOARD_SIZE:
+            self.en_passant_target = divmod((from_sq + to_sq) // 2, BOARD_SIZE)
+            zobrist ^= ZOBRIST_EP[start_col]
         
-        # Add move to history
-        self.move_history.append(move)
+        self.zobrist = zobrist ^ ZOBRIST_CASTLE[self.castling]
+        
+        # Add move to history as an immutable tuple of ints
+        self.move_history.append((from_sq, to_sq, flags,
+                                  PROMOTION_PIECES[promo] if flags == MOVE_PROMOTION else None))
         
         # Switch player
-        self.current_player = PieceColor.BLACK if self.current_player == PieceColor.WHITE else PieceColor.WHITE
+        self.current_player = BLACK_C if self.current_player == WHITE_C else WHITE_C
+        self.attack_maps = [None, None]
         
         # Update game state
         if update_state:
@@ -418,34 +605,66 @@ class Board:
         
         return True
     
+    def unmake_move(self):
+        move, toggles, castling, en_passant_target, king_sq, game_state, zobrist = self.undo_stack.pop()
+        
+        bb = self.bb
+        for idx, mask in toggles:
+            bb[idx] ^= mask
+        self.update_occupancy()
+        
+        self.current_player = BLACK_C if self.current_player == WHITE_C else WHITE_C
+        self.attack_maps = [None, None]
+        self.king_sq[self.current_player] = king_sq
+        self.castling = castling
+        self.en_passant_target = en_passant_target
+        self.game_state = game_state
+        self.zobrist = zobrist
+        self.move_history.pop()
+    
+    def attack_map(self, by_color):
+        attacks = self.attack_maps[by_color]
+        if attacks is None:
+            attacks = self.attack_maps[by_color] = self.compute_attack_map(by_color)
+        return attacks
+    
+    def compute_attack_map(self, by_color):
+        bb = self.bb
+        own = by_color * 6
+        attacks = 0
+        for sq in iter_bits(bb[own + PAWN]):
+            attacks |= PAWN_ATTACKS[by_color][sq]
+        for sq in iter_bits(bb[own + KNIGHT]):
+            attacks |= KNIGHT_ATTACKS[sq]
+        for sq in iter_bits(bb[own + KING]):
+            attacks |= KING_ATTACKS[sq]
+        queens = bb[own + QUEEN]
+        for sq in iter_bits(bb[own + BISHOP] | queens):
+            attacks |= bishop_attacks(self.occ_all, sq)
+        for sq in iter_bits(bb[own + ROOK] | queens):
+            attacks |= rook_attacks(self.occ_all, sq)
+        return attacks
+    
     def is_position_under_attack(self, position, color):
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.get_piece((row, col))
-                if piece and piece.color != color:
-                    # Pass for_attack=True to avoid recursion
-                    moves = piece.get_possible_moves(self, (row, col), for_attack=True)
-                    for move in moves:
-                        if (move.end_row, move.end_col) == position:
-                            return True
-        return False
+        row, col = position
+        sq = row * BOARD_SIZE + col
+        bb = self.bb
+        enemy = 6 if color == WHITE_C else 0
+        
+        # Look outward from the square as each piece type, cheapest tests first
+        if PAWN_ATTACKS[color][sq] & bb[enemy + WP]:
+            return True
+        if KNIGHT_ATTACKS[sq] & bb[enemy + WN]:
+            return True
+        if KING_ATTACKS[sq] & bb[enemy + WK]:
+            return True
+        queens = bb[enemy + WQ]
+        if bishop_attacks(self.occ_all, sq) & (bb[enemy + WB] | queens):
+            return True
+        return bool(rook_attacks(self.occ_all, sq) & (bb[enemy + WR] | queens))
     
     def is_in_check(self, color):
-        # Find the king
-        king_position = None
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.get_piece((row, col))
-                if piece and piece.color == color and piece.piece_type == PieceType.KING:
-                    king_position = (row, col)
-                    break
-            if king_position:
-                break
-        
-        # Check if the king is under attack
-        if king_position:
-            return self.is_position_under_attack(king_position, color)
-        return False
+        return self.is_position_under_attack(self.king_sq[color], color)
     
     def update_game_state(self):
         # Check if current player is in check
@@ -468,51 +687,98 @@ class Board:
     def is_stalemate(self):
         return self.has_no_valid_moves()
     
+    def pinned_pieces(self, color):
+        king_row, king_col = self.king_sq[color]
+        king = king_row * BOARD_SIZE + king_col
+        bb = self.bb
+        enemy = 6 if color == WHITE_C else 0
+        own = self.color_occupancy(color)
+        queens = bb[enemy + WQ]
+        
+        # Enemy sliders that would hit the king if our own pieces were not in the way
+        snipers = ((rook_attacks(self.occ_all ^ own, king) & (bb[enemy + WR] | queens)) |
+                   (bishop_attacks(self.occ_all ^ own, king) & (bb[enemy + WB] | queens)))
+        pinned = 0
+        for sniper in iter_bits(snipers):
+            blockers = BETWEEN[king][sniper] & self.occ_all
+            # Pinned when exactly one piece, ours, stands in between
+            if blockers & own and not blockers & (blockers - 1):
+                pinned |= blockers
+        return pinned
+    
+    def safe_movers(self, color):
+        # Pieces whose moves can never expose their own king: none while in check,
+        # otherwise everything except the king itself and pinned pieces
+        if self.is_in_check(color):
+            return 0
+        king_row, king_col = self.king_sq[color]
+        king_bb = 1 << (king_row * BOARD_SIZE + king_col)
+        return self.color_occupancy(color) & ~king_bb & ~self.pinned_pieces(color)
+    
+    def leaves_king_safe(self, move, color, safe_movers):
+        if safe_movers & (1 << (move & 63)) and move >> 14 != MOVE_EN_PASSANT:
+            return True
+        
+        # Try the move and see if it leaves the king in check
+        self.make_move(move, update_state=False)
+        in_check = self.is_in_check(color)
+        self.unmake_move()
+        return not in_check
+    
     def has_no_valid_moves(self):
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.get_piece((row, col))
-                if piece and piece.color == self.current_player:
-                    moves = piece.get_possible_moves(self, (row, col))
-                    for move in moves:
-                        # Try the move and see if it gets us out of check
-                        temp_board = self.copy()
-                        temp_board.make_move(move, update_state=False)
-                        if not temp_board.is_in_check(self.current_player):
-                            return False
+        color = self.current_player
+        safe_movers = self.safe_movers(color)
+        own_start = 0 if color == WHITE_C else 6
+        buf = self.move_buf
+        # Visit only occupied squares, one piece bitboard at a time
+        for piece_idx in range(own_start, own_start + 6):
+            piece = PIECE_TABLE[piece_idx]
+            for sq in iter_bits(self.bb[piece_idx]):
+                count = piece.get_possible_moves(self, divmod(sq, BOARD_SIZE), buf, 0)
+                for move in buf[:count]:
+                    if self.leaves_king_safe(move, color, safe_movers):
+                        return False
         return True
     
     def copy(self):
         new_board = Board(setup=False)
-        new_board.board = copy.deepcopy(self.board)
+        new_board.bb = self.bb[:]
+        new_board.occ_white = self.occ_white
+        new_board.occ_black = self.occ_black
+        new_board.occ_all = self.occ_all
+        new_board.castling = self.castling
+        new_board.zobrist = self.zobrist
+        new_board.king_sq = self.king_sq[:]
         new_board.current_player = self.current_player
         new_board.game_state = self.game_state
-        # Don't deep copy move history, just create a new empty list
-        new_board.move_history = []
+        # History entries are immutable tuples, so a shallow copy is enough
+        new_board.move_history = self.move_history[:]
         new_board.en_passant_target = self.en_passant_target
         return new_board
     
     def get_valid_moves(self, position):
+        return self.compute_valid_moves(self.zobrist, position)
+    
+    @functools.lru_cache(maxsize=4096)
+    def compute_valid_moves(self, zobrist, position):
+        # The Zobrist key identifies the position, so repeated lookups hit the cache
         piece = self.get_piece(position)
         if piece is None or piece.color != self.current_player:
-            return []
+            return ()
         
-        all_moves = piece.get_possible_moves(self, position)
-        valid_moves = []
-        
-        for move in all_moves:
-            # Try the move and see if it leaves the king in check
-            temp_board = self.copy()
-            temp_board.make_move(move, update_state=False)
-            if not temp_board.is_in_check(self.current_player):
-                valid_moves.append(move)
-                
-        return valid_moves
+        color = self.current_player
+        safe_movers = self.safe_movers(color)
+        count = piece.get_possible_moves(self, position, self.move_buf, 0)
+        return tuple(move for move in self.move_buf[:count] if self.leaves_king_safe(move, color, safe_movers))
 
 class ChessGame:
     def __init__(self):
         self.board = Board()
         self.screen = pygame.display.set_mode((WINDOW_SIZE, WINDOW_SIZE))
+        load_images()
+        self.board_surface = self.create_board_surface()
+        self.move_highlight = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
+        self.move_highlight.fill(MOVE_HIGHLIGHT)
         pygame.display.set_caption("Chess Game")
         self.selected_piece = None
         self.selected_pos = None
@@ -520,6 +786,12 @@ class ChessGame:
         self.clock = pygame.time.Clock()
         self.is_promotion_menu_active = False
         self.promotion_move = None
+        # What the display currently shows, so redraws only push squares that changed
+        self.dirty = True
+        self.full_redraw = True
+        self.drawn_bb = [0] * 12
+        self.drawn_highlights = set()
+        self.drawn_menu = False
     
     def run(self):
         running = True
@@ -529,36 +801,87 @@ class ChessGame:
                     running = False
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     self.handle_mouse_click(event.pos)
+                    self.dirty = True
+                elif event.type == pygame.WINDOWEXPOSED:
+                    self.dirty = True
+                    self.full_redraw = True
             
-            self.draw_board()
-            self.draw_pieces()
-            
-            if self.selected_pos:
-                self.highlight_selected()
-                self.highlight_valid_moves()
-            
-            if self.is_promotion_menu_active:
-                self.draw_promotion_menu()
-            
-            pygame.display.flip()
+            # Nothing changes on screen without input, so idle frames skip drawing
+            if self.dirty:
+                self.redraw()
+                self.dirty = False
             self.clock.tick(60)
             
         pygame.quit()
         sys.exit()
     
-    def draw_board(self):
+    def redraw(self):
+        self.draw_board()
+        self.draw_pieces()
+        
+        if self.selected_pos:
+            self.highlight_selected()
+            self.highlight_valid_moves()
+        
+        if self.is_promotion_menu_active:
+            self.draw_promotion_menu()
+        
+        update_rects = self.changed_rects()
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        elif update_rects:
+            pygame.display.update(update_rects)
+    
+    def changed_rects(self):
+        highlights = {(move.end_row, move.end_col) for move in self.valid_moves}
+        if self.selected_pos:
+            highlights.add(self.selected_pos)
+        
+        # Squares whose piece changed, plus squares highlighted before or now
+        changed = 0
+        for drawn, current in zip(self.drawn_bb, self.board.bb):
+            changed |= drawn ^ current
+        squares = highlights | self.drawn_highlights
+        squares.update(divmod(sq, BOARD_SIZE) for sq in iter_bits(changed))
+        rects = [pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
+                 for row, col in squares]
+        
+        if self.is_promotion_menu_active or self.drawn_menu:
+            rects.append(self.promotion_menu_rect())
+        
+        self.drawn_bb = self.board.bb[:]
+        self.drawn_highlights = highlights
+        self.drawn_menu = self.is_promotion_menu_active
+        return rects
+    
+    def promotion_menu_rect(self):
+        menu_width = SQUARE_SIZE * 4
+        menu_height = SQUARE_SIZE
+        return pygame.Rect((WINDOW_SIZE - menu_width) // 2, (WINDOW_SIZE - menu_height) // 2,
+                           menu_width, menu_height)
+    
+    def create_board_surface(self):
+        # The checkerboard never changes, so paint it once
+        surface = pygame.Surface((WINDOW_SIZE, WINDOW_SIZE))
         for row in range(BOARD_SIZE):
             for col in range(BOARD_SIZE):
                 rect = pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE)
                 color = LIGHT_SQUARE if (row + col) % 2 == 0 else DARK_SQUARE
-                pygame.draw.rect(self.screen, color, rect)
+                pygame.draw.rect(surface, color, rect)
+        return surface
+    
+    def draw_board(self):
+        self.screen.blit(self.board_surface, (0, 0))
     
     def draw_pieces(self):
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = self.board.get_piece((row, col))
-                if piece:
-                    self.screen.blit(piece.image, pygame.Rect(col * SQUARE_SIZE, row * SQUARE_SIZE, SQUARE_SIZE, SQUARE_SIZE))
+        blit_list = []
+        for idx, bb in enumerate(self.board.bb):
+            image = PIECE_TABLE[idx].image
+            for sq in iter_bits(bb):
+                row, col = divmod(sq, BOARD_SIZE)
+                blit_list.append((image, (col * SQUARE_SIZE, row * SQUARE_SIZE)))
+        self.screen.blits(blit_list, doreturn=0)
     
     def highlight_selected(self):
         row, col = self.selected_pos
@@ -566,11 +889,8 @@ class ChessGame:
         pygame.draw.rect(self.screen, HIGHLIGHT, rect, 4)
     
     def highlight_valid_moves(self):
-        for move in self.valid_moves:
-            end_row, end_col = move.end_row, move.end_col
-            highlight_surf = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
-            highlight_surf.fill(MOVE_HIGHLIGHT)
-            self.screen.blit(highlight_surf, (end_col * SQUARE_SIZE, end_row * SQUARE_SIZE))
+        self.screen.blits([(self.move_highlight, (move.end_col * SQUARE_SIZE, move.end_row * SQUARE_SIZE))
+                           for move in self.valid_moves], doreturn=0)
     
     def handle_mouse_click(self, pos):
         if self.is_promotion_menu_active:
@@ -589,7 +909,7 @@ class ChessGame:
                         self.is_promotion_menu_active = True
                         return
                     else:
-                        self.board.make_move(move)
+                        self.board.make_move(move.to_int())
                         move_made = True
                         break
             
@@ -598,7 +918,7 @@ class ChessGame:
                 self.valid_moves = []
             elif self.board.get_piece((row, col)) and self.board.get_piece((row, col)).color == self.board.current_player:
                 self.selected_pos = (row, col)
-                self.valid_moves = self.board.get_valid_moves(self.selected_pos)
+                self.valid_moves = self.get_valid_moves(self.selected_pos)
             else:
                 self.selected_pos = None
                 self.valid_moves = []
@@ -606,7 +926,11 @@ class ChessGame:
             piece = self.board.get_piece((row, col))
             if piece and piece.color == self.board.current_player:
                 self.selected_pos = (row, col)
-                self.valid_moves = self.board.get_valid_moves(self.selected_pos)
+                self.valid_moves = self.get_valid_moves(self.selected_pos)
+    
+    def get_valid_moves(self, position):
+        # The board works on packed ints; the UI inspects Move objects
+        return [Move.from_int(self.board, move) for move in self.board.get_valid_moves(position)]
     
     def draw_promotion_menu(self):
         menu_width = SQUARE_SIZE * 4
@@ -637,11 +961,11 @@ class ChessGame:
             return
         
         piece_index = (pos[0] - menu_x) // SQUARE_SIZE
-        promotion_pieces = [PieceType.QUEEN, PieceType.ROOK, PieceType.BISHOP, PieceType.KNIGHT]
+        promotion_pieces = [QUEEN, ROOK, BISHOP, KNIGHT]
         
         if 0 <= piece_index < len(promotion_pieces):
             self.promotion_move.promotion_piece = promotion_pieces[piece_index]
-            self.board.make_move(self.promotion_move)
+            self.board.make_move(self.promotion_move.to_int())
             self.is_promotion_menu_active = False
             self.selected_pos = None
             self.valid_moves = []